@@ -0,0 +1,242 @@
+"""Shared scanning logic for the Terraform RDS hardening checks.
+
+Patterns and the optional Hyperscan database are compiled once at import.
+Entry points only supply the source bytes and a message table keyed by
+hardening key, so localized or differently formatted front ends reuse the
+same checks.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from array import array
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+try:  # google-re2 matches in linear time; the stdlib engine backtracks
+    import re2 as _re
+except ImportError:
+    import re as _re
+
+try:  # Hyperscan/vectorscan finds every attribute key in one SIMD pass
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Terraform sources are scanned as raw bytes straight from an mmap.
+Source = Union[bytes, mmap.mmap]
+Attributes = Dict[str, Tuple[Any, int]]
+
+_MIN_ENGINE_MAJOR = 14
+# Spellings of true accepted for boolean attributes; a set lookup avoids lowercasing a copy.
+_TRUE = frozenset((b"true", b"True", b"TRUE"))
+
+
+class Finding(NamedTuple):
+    path: str
+    line: int
+    key: str
+    message: str
+
+
+def index_newlines(data: Source) -> array:
+    """Return the byte offsets of every newline in ``data``."""
+    nl_offsets = array("i")
+    idx = data.find(b"\n")
+    while idx >= 0:
+        nl_offsets.append(idx)
+        idx = data.find(b"\n", idx + 1)
+    return nl_offsets
+
+
+def line_at(nl_offsets: array, pos: int) -> int:
+    """Map a byte offset to its 1-based line number."""
+    return bisect_right(nl_offsets, pos) + 1
+
+
+def _parse_bool(raw: bytes) -> bool:
+    return raw in _TRUE
+
+
+def _parse_int(raw: bytes) -> Optional[int]:
+    return int(raw) if raw.isdigit() else None
+
+
+def _parse_major_version(raw: bytes) -> Optional[int]:
+    # Only the major component decides support, so the rest is never parsed.
+    major = raw.strip(b'"').split(b".", 1)[0]
+    return int(major) if major.isdigit() else None
+
+
+TOKENS: Dict[str, Callable[[bytes], Any]] = {
+    "storage_encrypted": _parse_bool,
+    "publicly_accessible": _parse_bool,
+    "backup_retention_period": _parse_int,
+    "engine_version": _parse_major_version,
+    "performance_insights_enabled": _parse_bool,
+}
+
+# Byte forms of the attribute keys, encoded once for searches over the raw source.
+_TOKEN_BYTES = {key: key.encode() for key in TOKENS}
+_TOKEN_NAMES = {raw: key for key, raw in _TOKEN_BYTES.items()}
+
+# Compiled once at import; scans reuse the same (DFA-backed when re2 is present) pattern.
+_RE_ALL = _re.compile(rb"(%s)\s*=\s*(\"?[\w.]+\"?)" % b"|".join(_TOKEN_BYTES.values()))
+_RE_VALUE = _re.compile(rb"\s*=\s*(\"?[\w.]+\"?)")
+# Only RDS instance blocks are checked; other resources and .tf files carry none of the attributes.
+_RE_DB_INSTANCE = _re.compile(rb'resource\s+"aws_db_instance"\s+"[^"\n]*"\s*\{')
+# Braces inside strings and comments do not count towards block nesting.
+_RE_BLOCK_TOKEN = _re.compile(rb'"(?:[^"\\\n]|\\.)*"|#[^\n]*|//[^\n]*|[{}]')
+
+_HS_KEYS = tuple(TOKENS)
+_HS_DB = None
+if hyperscan is not None:
+    _HS_DB = hyperscan.Database()
+    _HS_DB.compile(
+        expressions=[_TOKEN_BYTES[key] for key in _HS_KEYS],
+        ids=list(range(len(_HS_KEYS))),
+        elements=len(_HS_KEYS),
+        flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(_HS_KEYS),
+    )
+
+
+def _iter_assignments(data: Source) -> Iterator[Tuple[str, bytes, int]]:
+    """Yield ``(attribute, raw value, offset)`` for every assignment in file order."""
+    if _HS_DB is None:
+        for match in _RE_ALL.finditer(data):
+            yield _TOKEN_NAMES[match.group(1)], match.group(2), match.start()
+        return
+
+    hits: List[Tuple[int, int, int]] = []
+
+    def on_match(key_id: int, start: int, end: int, flags: int, context: Any) -> None:
+        hits.append((key_id, start, end))
+
+    _HS_DB.scan(data, match_event_handler=on_match)
+    for key_id, start, end in hits:
+        match = _RE_VALUE.match(data, end)
+        if match:
+            yield _HS_KEYS[key_id], match.group(1), start
+
+
+def _iter_db_instances(data: Source) -> Iterator[Tuple[int, int]]:
+    """Yield the ``(start, end)`` byte range of every ``aws_db_instance`` resource block."""
+    for match in _RE_DB_INSTANCE.finditer(data):
+        depth = 1
+        end = len(data)
+        for token in _RE_BLOCK_TOKEN.finditer(data, match.end()):
+            brace = token.group()
+            if brace == b"{":
+                depth += 1
+            elif brace == b"}":
+                depth -= 1
+                if depth == 0:
+                    end = token.end()
+                    break
+        yield match.start(), end
+
+
+def scan_attributes(block: bytes, nl_offsets: array, offset: int = 0) -> Attributes:
+    """Collect the parsed value and line number of every known attribute in ``block``.
+
+    ``offset`` is the position of ``block`` within the file, used to resolve
+    line numbers. All assignments are found in one pass over the raw bytes;
+    the first assignment of each attribute wins. Attributes that are never
+    assigned map to ``None`` and the line of their first mention (or of the
+    start of the block).
+    """
+    found: Attributes = {}
+    for token, raw, pos in _iter_assignments(block):
+        if token in found:
+            continue
+        found[token] = (TOKENS[token](raw), line_at(nl_offsets, offset + pos))
+        if len(found) == len(TOKENS):
+            break
+    for token in TOKENS:
+        if token not in found:
+            pos = block.find(_TOKEN_BYTES[token])
+            found[token] = (None, line_at(nl_offsets, offset + max(pos, 0)))
+    return found
+
+
+def check_storage_encryption(
+    found: Attributes, findings: List[Finding], messages: Mapping[str, str], path: str
+) -> None:
+    enabled, line = found["storage_encrypted"]
+    if not enabled:
+        findings.append(Finding(path=path, line=line, key="AWS-RDS-19", message=messages["AWS-RDS-19"]))
+
+
+def check_public_access(
+    found: Attributes, findings: List[Finding], messages: Mapping[str, str], path: str
+) -> None:
+    public, line = found["publicly_accessible"]
+    if public:
+        findings.append(Finding(path=path, line=line, key="AWS-RDS-07", message=messages["AWS-RDS-07"]))
+
+
+def check_backup_retention(
+    found: Attributes, findings: List[Finding], messages: Mapping[str, str], path: str
+) -> None:
+    days, line = found["backup_retention_period"]
+    if (days or 0) < 7:
+        findings.append(Finding(path=path, line=line, key="AWS-RDS-12", message=messages["AWS-RDS-12"]))
+
+
+def check_engine_version(
+    found: Attributes, findings: List[Finding], messages: Mapping[str, str], path: str
+) -> None:
+    major, line = found["engine_version"]
+    if major is not None and major < _MIN_ENGINE_MAJOR:
+        findings.append(Finding(path=path, line=line, key="AWS-RDS-03", message=messages["AWS-RDS-03"]))
+
+
+def check_performance_insights(
+    found: Attributes, findings: List[Finding], messages: Mapping[str, str], path: str
+) -> None:
+    enabled, line = found["performance_insights_enabled"]
+    if not enabled:
+        findings.append(Finding(path=path, line=line, key="AWS-RDS-24", message=messages["AWS-RDS-24"]))
+
+
+CHECKS = (
+    check_storage_encryption,
+    check_public_access,
+    check_backup_retention,
+    check_engine_version,
+    check_performance_insights,
+)
+
+
+def run_checks(data: Source, nl_offsets: array, messages: Mapping[str, str], path: str) -> List[Finding]:
+    """Run every check against each ``aws_db_instance`` block in ``data``, in check order.
+
+    Files without an RDS instance yield no findings.
+    """
+    findings: List[Finding] = []
+    for start, end in _iter_db_instances(data):
+        found = scan_attributes(data[start:end], nl_offsets, start)
+        for check in CHECKS:
+            check(found, findings, messages, path)
+    return findings
+
+
+def load_source(path: str) -> Tuple[Source, array]:
+    """Map ``path`` read-only and index its newlines."""
+    with open(path, "rb") as handle:
+        # mmap cannot map empty files; there is nothing to scan in that case anyway.
+        if os.fstat(handle.fileno()).st_size == 0:
+            return b"", array("i")
+        data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return data, index_newlines(data)
+
+
+def scan_file(path: str, messages: Mapping[str, str]) -> List[Finding]:
+    """Scan a single Terraform file. Module-level so process pools can pickle it."""
+    data, nl_offsets = load_source(path)
+    try:
+        return run_checks(data, nl_offsets, messages, path)
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
@@ -9,153 +9,151 @@ the Security tab via the ComplianceFrameworkPoC scanner output.
 
 from __future__ import annotations
 
-import re
+import argparse
+import glob
+import json
+import os
 import sys
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Iterable, List
+from types import MappingProxyType
+from typing import Dict, List, Optional, Sequence, TextIO
 
-TERRAFORM_FILE = Path("terraform/main.tf")
+from _hardening_core import Finding, scan_file
+
+try:  # orjson serializes SARIF several times faster than the stdlib encoder
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_PATTERN = "terraform/**/*.tf"
 SARIF_OUTPUT = Path("reports/hardening-results.sarif")
 TOOL_NAME = "ComplianceFrameworkPoC"
+# Below this many files, worker startup costs more than scanning in-process.
+PARALLEL_MIN_FILES = 4
 
-HARDENING_RULES = {
-    "AWS-RDS-03": {
+# ensure_ascii keeps every chunk pure ASCII, so it can be written with the cheap ASCII codec.
+_JSON_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=True)
+
+HARDENING_RULES = MappingProxyType({
+    "AWS-RDS-03": MappingProxyType({
         "name": "Supported engine versions",
         "short": "RDS engines must remain on supported versions",
         "full": "Engine versions must be kept within the vendor support window (CIS Amazon RDS Benchmark v1.1 control 1.5).",
-    },
-    "AWS-RDS-07": {
+    }),
+    "AWS-RDS-07": MappingProxyType({
         "name": "No public exposure",
         "short": "RDS instances must not be publicly accessible",
         "full": "Public accessibility should be disabled to enforce network segmentation (CIS Amazon RDS Benchmark v1.1 control 2.1).",
-    },
-    "AWS-RDS-12": {
+    }),
+    "AWS-RDS-12": MappingProxyType({
         "name": "Backup retention",
         "short": "Automated backups must retain ≥7 days",
         "full": "Retention below seven days breaks recoverability expectations (CIS Amazon RDS Benchmark v1.1 control 1.10).",
-    },
-    "AWS-RDS-19": {
+    }),
+    "AWS-RDS-19": MappingProxyType({
         "name": "Encryption at rest",
         "short": "RDS storage must be encrypted",
         "full": "Storage encryption protects data at rest and becomes mandatory by Q2 2026 (CIS Amazon RDS Benchmark v1.1 control 1.6).",
-    },
-    "AWS-RDS-24": {
+    }),
+    "AWS-RDS-24": MappingProxyType({
         "name": "Monitoring visibility",
         "short": "Performance Insights must be enabled",
         "full": "Operational telemetry is required to detect policy drift (derived from CIS Amazon RDS Benchmark v1.1 monitoring controls).",
+    }),
+})
+
+# SARIF metadata only depends on HARDENING_RULES, so it is built once at import and
+# shared by every export. The dicts stay plain so json/orjson can serialize them; treat
+# them as read-only. Tuples serialize as JSON arrays.
+_SARIF_RULES = tuple(
+    {
+        "id": key,
+        "name": f"[{key}] {meta['name']}",
+        "shortDescription": {"text": f"[{key}]: {meta['short']}"},
+        "fullDescription": {"text": meta["full"]},
+        "helpUri": "https://www.cisecurity.org/benchmark/amazon_web_services",
+        "defaultConfiguration": {"level": "warning"},
+        "properties": {"tags": ["cis", "rds", "security", key]},
+    }
+    for key, meta in HARDENING_RULES.items()
+)
+_SARIF_TOOL = {"driver": {"name": TOOL_NAME, "rules": _SARIF_RULES}}
+
+# Finding messages per locale and hardening key; the checks themselves live in _hardening_core.
+MESSAGES = {
+    "en": {
+        "AWS-RDS-03": "CIS Amazon RDS Benchmark v1.1 – Supported Engine Versions: Engine version <14.x reaches EOL before Q2 2026; upgrade required.",
+        "AWS-RDS-07": "CIS Amazon RDS Benchmark v1.1 – Network Exposure: Instance is publicly accessible, violating segmentation requirements.",
+        "AWS-RDS-12": "CIS Amazon RDS Benchmark v1.1 – Automated Backups: retention <7 days. Non-compliant after Q2 2026.",
+        "AWS-RDS-19": "CIS Amazon RDS Benchmark v1.1 – Encryption at Rest: 'storage_encrypted' is disabled. This control becomes mandatory by Q2 2026.",
+        "AWS-RDS-24": "CIS Amazon RDS Benchmark v1.1 – Monitoring: Performance Insights disabled, preventing metric collection required by Q2 2026.",
+    },
+    "de": {
+        "AWS-RDS-03": "CIS Amazon RDS Benchmark v1.1 – Unterstützte Engine-Versionen: Engine-Version <14.x erreicht vor Q2 2026 das End-of-Life; Upgrade erforderlich.",
+        "AWS-RDS-07": "CIS Amazon RDS Benchmark v1.1 – Netzwerkexposition: Instanz ist öffentlich erreichbar und verletzt die Segmentierungsanforderungen.",
+        "AWS-RDS-12": "CIS Amazon RDS Benchmark v1.1 – Automatische Backups: Aufbewahrung <7 Tage. Ab Q2 2026 nicht konform.",
+        "AWS-RDS-19": "CIS Amazon RDS Benchmark v1.1 – Verschlüsselung ruhender Daten: 'storage_encrypted' ist deaktiviert. Diese Kontrolle wird ab Q2 2026 verpflichtend.",
+        "AWS-RDS-24": "CIS Amazon RDS Benchmark v1.1 – Monitoring: Performance Insights deaktiviert, die bis Q2 2026 geforderte Metrikerfassung fehlt.",
     },
 }
+OUTPUT_FORMATS = ("sarif", "warnings")
 
 
-@dataclass
-class Finding:
-    line: int
-    key: str
-    message: str
-
-
-def read_terraform_source() -> tuple[str, list[str]]:
-    if not TERRAFORM_FILE.exists():
-        print(f"::error::Terraform file {TERRAFORM_FILE} not found – cannot run checks")
+def collect_terraform_files(patterns: Sequence[str]) -> List[str]:
+    files = sorted(
+        {path for pattern in patterns for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)}
+    )
+    if not files:
+        print(f"::error::No Terraform files match {' '.join(patterns)} – cannot run checks")
         sys.exit(1)
-    text = TERRAFORM_FILE.read_text(encoding="utf-8")
-    return text, text.splitlines()
-
-
-def line_with_token(lines: Iterable[str], token: str) -> int:
-    for idx, line in enumerate(lines, start=1):
-        if token in line:
-            return idx
-    return 1
-
-
-def record_finding(findings: List[Finding], line: int, key: str, message: str) -> None:
-    print(f"::warning file={TERRAFORM_FILE},line={line},col=1::[{key}] {message}")
-    findings.append(Finding(line=line, key=key, message=message))
+    return files
 
 
-def check_storage_encryption(text: str, lines: list[str], findings: List[Finding]) -> None:
-    match = re.search(r"storage_encrypted\s*=\s*(\w+)", text)
-    if not match or match.group(1).lower() != "true":
-        line = line_with_token(lines, "storage_encrypted")
-        record_finding(
-            findings,
-            line,
-            "AWS-RDS-19",
-            "CIS Amazon RDS Benchmark v1.1 – Encryption at Rest: 'storage_encrypted' is disabled. This control becomes mandatory by Q2 2026.",
-        )
-
-
-def check_public_access(text: str, lines: list[str], findings: List[Finding]) -> None:
-    match = re.search(r"publicly_accessible\s*=\s*(\w+)", text)
-    if match and match.group(1).lower() == "true":
-        line = line_with_token(lines, "publicly_accessible")
-        record_finding(
-            findings,
-            line,
-            "AWS-RDS-07",
-            "CIS Amazon RDS Benchmark v1.1 – Network Exposure: Instance is publicly accessible, violating segmentation requirements.",
-        )
+def format_warning(finding: Finding) -> str:
+    return f"::warning file={finding.path},line={finding.line},col=1::[{finding.key}] {finding.message}\n"
 
 
-def check_backup_retention(text: str, lines: list[str], findings: List[Finding]) -> None:
-    match = re.search(r"backup_retention_period\s*=\s*(\d+)", text)
-    days = int(match.group(1)) if match else 0
-    if days < 7:
-        line = line_with_token(lines, "backup_retention_period")
-        record_finding(
-            findings,
-            line,
-            "AWS-RDS-12",
-            "CIS Amazon RDS Benchmark v1.1 – Automated Backups: retention <7 days. Non-compliant after Q2 2026.",
-        )
-
+class Scanner:
+    """Scans Terraform files for one locale and emits the findings in the requested format."""
 
-def check_engine_version(text: str, lines: list[str], findings: List[Finding]) -> None:
-    match = re.search(r'engine_version\s*=\s*"([0-9.]+)"', text)
-    if not match:
-        return
-    version = tuple(int(part) for part in match.group(1).split("."))
-    if version < (14, 0):
-        line = line_with_token(lines, "engine_version")
-        record_finding(
-            findings,
-            line,
-            "AWS-RDS-03",
-            "CIS Amazon RDS Benchmark v1.1 – Supported Engine Versions: Engine version <14.x reaches EOL before Q2 2026; upgrade required.",
-        )
+    def __init__(self, locale: str = "en", sink: Optional[TextIO] = None) -> None:
+        self.messages = MESSAGES[locale]
+        self.sink = sink if sink is not None else sys.stdout
 
+    def scan(self, files: Sequence[str]) -> List[Finding]:
+        """Scan every file, fanning out to worker processes for larger batches."""
+        scan = partial(scan_file, messages=self.messages)
+        workers = min(os.cpu_count() or 1, len(files))
+        if len(files) < PARALLEL_MIN_FILES or workers < 2:
+            return list(chain.from_iterable(map(scan, files)))
+        # Several chunks per worker keep every process busy without per-file IPC overhead.
+        chunksize = max(1, len(files) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(chain.from_iterable(executor.map(scan, files, chunksize=chunksize)))
 
-def check_performance_insights(text: str, lines: list[str], findings: List[Finding]) -> None:
-    match = re.search(r"performance_insights_enabled\s*=\s*(\w+)", text)
-    if not match or match.group(1).lower() != "true":
-        line = line_with_token(lines, "performance_insights_enabled")
-        record_finding(
-            findings,
-            line,
-            "AWS-RDS-24",
-            "CIS Amazon RDS Benchmark v1.1 – Monitoring: Performance Insights disabled, preventing metric collection required by Q2 2026.",
-        )
+    def emit(self, findings: List[Finding], fmt: str = "sarif") -> None:
+        """Write GitHub annotations and, for the ``sarif`` format, the SARIF report."""
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"unknown output format {fmt!r}; expected one of {', '.join(OUTPUT_FORMATS)}")
+        # One write for all annotations instead of a print (and flush) per finding.
+        self.sink.write("".join(format_warning(finding) for finding in findings))
+        if fmt == "sarif":
+            write_sarif(findings)
+            self.sink.write(f"SARIF output written to {SARIF_OUTPUT}\n")
 
 
 def write_sarif(findings: List[Finding]) -> None:
     SARIF_OUTPUT.parent.mkdir(parents=True, exist_ok=True)
-    rules = []
-    for key, meta in HARDENING_RULES.items():
-        rule = {
-            "id": key,
-            "name": f"[{key}] {meta['name']}",
-            "shortDescription": {"text": f"[{key}]: {meta['short']}"},
-            "fullDescription": {"text": meta["full"]},
-            "helpUri": "https://www.cisecurity.org/benchmark/amazon_web_services",
-            "defaultConfiguration": {"level": "warning"},
-            "properties": {"tags": ["cis", "rds", "security", key]},
-        }
-        rules.append(rule)
-
+    # One shared artifactLocation per scanned file.
+    artifacts: Dict[str, dict] = {}
     results = []
     for finding in findings:
+        artifact = artifacts.get(finding.path)
+        if artifact is None:
+            artifact = artifacts[finding.path] = {"uri": finding.path}
         results.append(
             {
                 "ruleId": finding.key,
@@ -164,7 +162,7 @@ def write_sarif(findings: List[Finding]) -> None:
                 "locations": [
                     {
                         "physicalLocation": {
-                            "artifactLocation": {"uri": str(TERRAFORM_FILE)},
+                            "artifactLocation": artifact,
                             "region": {"startLine": finding.line, "startColumn": 1},
                         }
                     }
@@ -178,40 +176,47 @@ def write_sarif(findings: List[Finding]) -> None:
         "$schema": "https://schemas.microsoft.com/sarif/2.1.0/sarif-schema.json",
         "runs": [
             {
-                "tool": {
-                    "driver": {
-                        "name": TOOL_NAME,
-                        "rules": rules,
-                    }
-                },
+                "tool": _SARIF_TOOL,
                 "results": results,
             }
         ],
     }
 
-    SARIF_OUTPUT.write_text(repr_json(sarif_document), encoding="utf-8")
-    print(f"SARIF output written to {SARIF_OUTPUT}")
-
-
-def repr_json(data: dict) -> str:
-    # Minimal JSON serializer without importing json (keeps script dependency-free)
-    import json
-
-    return json.dumps(data, indent=2)
+    if orjson is not None:
+        SARIF_OUTPUT.write_bytes(orjson.dumps(sarif_document, option=orjson.OPT_INDENT_2))
+    else:
+        # Stream the encoder output so the whole document never exists as one string.
+        with SARIF_OUTPUT.open("wb", buffering=1 << 20) as handle:
+            for chunk in _JSON_ENCODER.iterencode(sarif_document):
+                handle.write(chunk.encode("ascii"))
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Checks Terraform code for simplified CIS Amazon RDS hardening violations."
+    )
+    parser.add_argument(
+        "patterns",
+        nargs="*",
+        default=[DEFAULT_PATTERN],
+        help=f"Terraform files or glob patterns to scan (default: {DEFAULT_PATTERN})",
+    )
+    parser.add_argument("--locale", choices=sorted(MESSAGES), default="en", help="Language of finding messages")
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="sarif",
+        help="sarif: annotations plus SARIF report (default); warnings: annotations only",
+    )
+    return parser.parse_args(argv)
 
 
 def main() -> None:
+    args = parse_args()
     print("Starting Terraform hardening demo...")
-    text, lines = read_terraform_source()
-    findings: List[Finding] = []
-
-    check_storage_encryption(text, lines, findings)
-    check_public_access(text, lines, findings)
-    check_backup_retention(text, lines, findings)
-    check_engine_version(text, lines, findings)
-    check_performance_insights(text, lines, findings)
-
-    write_sarif(findings)
+    scanner = Scanner(args.locale)
+    findings = scanner.scan(collect_terraform_files(args.patterns))
+    scanner.emit(findings, args.format)
 
     print("Scan finished – review warnings for details.")
 